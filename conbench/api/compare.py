@@ -384,8 +384,18 @@ class CompareBenchmarkResultsAPI(ApiEndpoint):
             return resp429("doing other /compare work, retry soon")
 
     def _get(self, compare_ids: str) -> f.Response:
-        baseline_result_id, contender_result_id = _parse_two_ids_or_abort(compare_ids)
         threshold, threshold_z = _get_threshold_args_from_request()
+        return f.jsonify(
+            self._get_response_as_dict(compare_ids, threshold, threshold_z)
+        )
+
+    def _get_response_as_dict(
+        self,
+        compare_ids: str,
+        threshold: Optional[float],
+        threshold_z: Optional[float],
+    ) -> dict:
+        baseline_result_id, contender_result_id = _parse_two_ids_or_abort(compare_ids)
         baseline_result = self._get_a_result(baseline_result_id)
         contender_result = self._get_a_result(contender_result_id)
 
@@ -425,7 +435,7 @@ class CompareBenchmarkResultsAPI(ApiEndpoint):
         except UnmatchingUnitsError as e:
             f.abort(400, description=str(e))
 
-        return f.jsonify(comparator._dict_for_api_json)
+        return comparator._dict_for_api_json
 
 
 # from filprofiler.api import profile as filprofile
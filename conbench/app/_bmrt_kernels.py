@@ -0,0 +1,53 @@
+"""
+Numeric helpers operating on the column-oriented (struct-of-arrays) data in the
+BMRT cache, see `conbench.bmrt.BMRTArrays`.
+
+The goal is to do per-result work in numpy (i.e. in C loops) rather than in a
+Python loop body that accesses attributes of many individual objects.
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+def group_by_hw_ctx(
+    started_at: np.ndarray, hw_codes: np.ndarray, ctx_codes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Group N results by (hardware, context). The input arrays are of length N
+    and refer to the same results by index.
+
+    Groups are numbered in order of first appearance in the input (like the
+    keys of a dictionary populated while iterating over the results).
+
+    Return a 3-tuple `(offsets, order, newest_idx_per_group)`:
+
+    - `order`: a permutation of `range(N)` in which results belonging to the
+      same group are contiguous. Within a group, input order is retained.
+    - `offsets`: int64 array of length G+1. The indices of the results in group
+      `g` are `order[offsets[g]:offsets[g+1]]`.
+    - `newest_idx_per_group`: int64 array of length G. Index of the newest
+      result (by `started_at`) in each group. On a tie, the first one (in input
+      order) wins, i.e. this behaves like Python's max().
+    """
+    # Combine both codes into one integer key per result. `inverse` maps each
+    # result to its group. np.unique() numbers groups by sorted key; renumber
+    # them (0..G-1) by first appearance in the input.
+    keys = hw_codes * (ctx_codes.max() + 1) + ctx_codes
+    _, first_idx, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    rank = np.empty_like(first_idx)
+    rank[np.argsort(first_idx)] = np.arange(len(first_idx))
+    inverse = rank[inverse.ravel()]
+
+    offsets = np.zeros(inverse.max() + 2, dtype=np.int64)
+    np.cumsum(np.bincount(inverse), out=offsets[1:])
+
+    # Stable sort: within each group, retain input order.
+    order = np.argsort(inverse, kind="stable")
+
+    # Sort by group, then by time (newest first). np.lexsort() is stable, and
+    # uses the last key as primary key.
+    by_group_newest_first = np.lexsort((-started_at, inverse))
+    newest_idx_per_group = by_group_newest_first[offsets[:-1]]
+
+    return offsets, order, newest_idx_per_group
@@ -1,21 +1,30 @@
 import collections
 import functools
+import itertools
 import logging
 import math
 import time
-from typing import Dict, List, Tuple, TypedDict, TypeVar
+from typing import Dict, List, Optional, Set, Tuple, TypedDict, TypeVar, Union
 
 import flask
+import flask_login
 import numpy as np
 import numpy.polynomial
 import orjson
 import pandas as pd
+from markupsafe import Markup
 
 import conbench.numstr
 import conbench.units
 from conbench.app import app
+from conbench.app._bmrt_kernels import group_by_hw_ctx
 from conbench.app._endpoint import authorize_or_terminate
-from conbench.bmrt import BMRTBenchmarkResult, TBenchmarkName, bmrt_cache
+from conbench.bmrt import (
+    BMRTBenchmarkResult,
+    CacheUpdateMetaInfo,
+    TBenchmarkName,
+    bmrt_cache,
+)
 from conbench.config import Config
 from conbench.outlier import remove_outliers_by_iqrdist
 
@@ -33,6 +42,46 @@ numstr8 = functools.partial(conbench.numstr.numstr, sigfigs=8)
 log = logging.getLogger(__name__)
 
 
+# Rendered HTML of pages that only depend on the BMRT cache state. Each value
+# also holds the cache meta info object that was current when rendering
+# started; a cache refresh replaces that object, which invalidates the entry.
+_page_cache: Dict[Tuple[str, ...], Tuple[CacheUpdateMetaInfo, str]] = {}
+
+# There is one page per benchmark name (e.g. visited by a crawler): bound the
+# number of entries. When full, the oldest entry is evicted.
+_PAGE_CACHE_MAX_ENTRIES = 100
+
+
+def _page_is_cacheable() -> bool:
+    # The page header shows the logged-in user, and pending flash messages.
+    # Only serve (and store) pages rendered for anonymous users without pending
+    # flash messages. Call this before rendering: rendering consumes the flash
+    # messages.
+    return flask_login.current_user.is_anonymous and not flask.session.get("_flashes")
+
+
+def _get_cached_page(key: Tuple[str, ...]) -> Optional[str]:
+    cached = _page_cache.get(key)
+    if cached is not None and cached[0] is bmrt_cache["meta"]:
+        return cached[1]
+    return None
+
+
+def _set_cached_page(
+    key: Tuple[str, ...], meta: CacheUpdateMetaInfo, html: str
+) -> None:
+    global _page_cache
+
+    # Drop entries from previous cache states to bound memory usage. Build a
+    # new dictionary instead of mutating the one that other threads may read.
+    entries = [(k, v) for k, v in _page_cache.items() if v[0] is meta and k != key]
+    # Make room for the new entry (evict the oldest).
+    n_keep = _PAGE_CACHE_MAX_ENTRIES - 1
+    entries = entries[-n_keep:]
+    _page_cache = dict(entries)
+    _page_cache[key] = (meta, html)
+
+
 def newest_of_many_results(results: List[BMRTBenchmarkResult]) -> BMRTBenchmarkResult:
     return max(results, key=lambda r: r.started_at)
 
@@ -41,6 +90,23 @@ def time_of_newest_of_many_results(results: List[BMRTBenchmarkResult]) -> float:
     return max(r.started_at for r in results)
 
 
+def uplot_infos_to_json_markup(infos: Dict[str, "TypeUIPlotInfo"]) -> Markup:
+    """
+    Serialize plot info structure to JSON for embedding into a template (to
+    be consumed by JavaScript).
+
+    This document can be large (many data points). Do not indent it (it is
+    not meant to be read by humans), and mark it as safe so that Jinja does
+    not apply autoescaping to it. orjson emits UTF-8 bytes; Jinja wants str.
+
+    The data for uplot may be provided as numpy arrays: orjson serializes
+    these natively (without creating a Python object per item).
+    """
+    return Markup(
+        orjson.dumps(infos, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+    )
+
+
 # Make this function's return type precisely be the type of input `d`, which is
 # often more specific than just Dict.
 GenDict = TypeVar("GenDict")  # the variable name must coincide with the string
@@ -49,42 +115,36 @@ GenDict = TypeVar("GenDict")  # the variable name must coincide with the string
 def get_first_n_dict_subset(d: GenDict, n: int) -> GenDict:
     # A bit of discussion here:
     # https://stackoverflow.com/a/12980510/145400
+    # islice() stops after n items, i.e. this does not copy all keys of `d`.
     assert isinstance(d, dict)
-    return {k: d[k] for k in list(d)[:n]}  # type: ignore
+    return dict(itertools.islice(d.items(), n))  # type: ignore
 
 
 @app.route("/c-benchmarks/", methods=["GET"])  # type: ignore
 @authorize_or_terminate
 def list_benchmarks() -> str:
-    # Sort alphabetically by string key
-    benchmarks_by_name_sorted_alphabetically = dict(
-        sorted(
-            bmrt_cache["by_benchmark_name"].items(), key=lambda item: item[0].lower()
-        )
-    )
-
-    newest_result_by_bname: Dict[str, BMRTBenchmarkResult] = {
-        bname: newest_of_many_results(bmrlist)
-        for bname, bmrlist in bmrt_cache["by_benchmark_name"].items()
+    cache_key = ("list",)
+    cacheable = _page_is_cacheable()
+    if cacheable:
+        cached_html = _get_cached_page(cache_key)
+        if cached_html is not None:
+            return cached_html
+
+    cache_meta = bmrt_cache["meta"]
+
+    # The sort orders are precomputed during BMRT cache population. Bind the
+    # aggregates object once: it is replaced as a whole upon cache refresh,
+    # i.e. the lookups below are consistent with each other.
+    aggs = bmrt_cache["bname_aggregates"]
+    by_name = aggs.by_benchmark_name
+    benchmarks_by_name_sorted_by_resultcount = {
+        bname: by_name[bname] for bname in aggs.bnames_sorted_by_resultcount
     }
 
-    newest_result_for_each_benchmark_name_sorted = [
-        bmr
-        for _, bmr in sorted(
-            newest_result_by_bname.items(),
-            key=lambda item: item[1].started_at,
-            reverse=True,
-        )
+    newest_result_for_each_benchmark_name_topN = [
+        aggs.newest_by_bname[bname] for bname in aggs.bnames_newest_topn
     ]
 
-    benchmarks_by_name_sorted_by_resultcount = dict(
-        sorted(
-            bmrt_cache["by_benchmark_name"].items(),
-            key=lambda item: len(item[1]),
-            reverse=True,
-        ),
-    )
-
     # Note(JP): build an average "results per case and recency" metric that
     # favors those benchmarks that have have more results per case permutation
     # and that have most of their results reported in the recent past. As we
@@ -92,9 +152,12 @@ def list_benchmarks() -> str:
     # is what we look at as the individual benchmark.
     # See https://github.com/conbench/conbench/issues/1264 for definition of
     # rpcr.
+    # Note that the rendered page is cached (for anonymous users) until the
+    # next BMRT cache refresh: in that case the RPCR values reflect `now` at
+    # the time of rendering, and do not further decay between refreshes.
     now = time.time()
     benchmark_names_by_rpcr: Dict[str, str] = {}
-    for bname, results in bmrt_cache["by_benchmark_name"].items():
+    for bname, results in by_name.items():
         # Generally, there are C case permutations for this benchmark. Group
         # the results by case permutation.
         results_per_case: Dict[
@@ -126,20 +189,21 @@ def list_benchmarks() -> str:
         )
     )
 
-    return flask.render_template(
+    html = flask.render_template(
         "c-benchmarks.html",
-        benchmarks_by_name=bmrt_cache["by_benchmark_name"],
+        benchmarks_by_name=by_name,
         benchmark_result_count=len(bmrt_cache["by_id"]),
-        benchmarks_by_name_sorted_alphabetically=benchmarks_by_name_sorted_alphabetically,
+        bnames_alpha=aggs.bnames_sorted_alpha,
         benchmarks_by_name_sorted_by_resultcount=benchmarks_by_name_sorted_by_resultcount,
         benchmark_names_by_rpcr_sorted=benchmark_names_by_rpcr_sorted,
-        newest_result_for_each_benchmark_name_topN=newest_result_for_each_benchmark_name_sorted[
-            :20
-        ],
-        bmr_cache_meta=bmrt_cache["meta"],
+        newest_result_for_each_benchmark_name_topN=newest_result_for_each_benchmark_name_topN,
+        bmr_cache_meta=cache_meta,
         application=Config.APPLICATION_NAME,
         title=Config.APPLICATION_NAME,  # type: ignore
     )
+    if cacheable:
+        _set_cached_page(cache_key, cache_meta, html)
+    return html
 
 
 @app.route("/c-benchmarks/<bname>/trends", methods=["GET"])  # type: ignore
@@ -301,11 +365,7 @@ def show_trends_for_benchmark(bname: TBenchmarkName) -> str:
     # Merge uplot info dicts together.
     infos_for_uplots_both = infos_for_uplots_incrtrend | infos_for_uplots_decrtrend
 
-    # Need to find a way to put bytes straight into jinja template.
-    # still is still a tiny bit faster than using stdlib json.dumps()
-    infos_for_uplots_json = orjson.dumps(
-        infos_for_uplots_both, option=orjson.OPT_INDENT_2
-    ).decode("utf-8")
+    infos_for_uplots_json = uplot_infos_to_json_markup(infos_for_uplots_both)
 
     log.info("built plot info JSON")
 
@@ -362,19 +422,15 @@ def _build_plotinfo_from_topnt3_dict(
             results[0].case_dict, option=orjson.OPT_INDENT_2
         ).decode("utf-8")
 
-        units_seen = set()
         newest_result = newest_of_many_results(results)
-        for r in results:
-            units_seen.add(r.unit)
 
         infos_for_uplots[f"{caseid}_{hwchecksum}_{ctxid}"] = {
             # deduplicate with code below
+            # Same encoding as in show_benchmark_results(): int timestamps,
+            # rounded float values (NaN is serialized as null).
             "data_for_uplot": [
-                [int(r.started_at) for r in results],
-                [
-                    conbench.numstr.numstr(r.svs, 7) if not math.isnan(r.svs) else None
-                    for r in results
-                ],
+                np.array([r.started_at for r in results]).astype(np.int64),
+                conbench.numstr.round_sigfigs(np.array([r.svs for r in results]), 7),
             ],
             "hwchecksum": hwchecksum,
             "ctxid": ctxid,
@@ -401,6 +457,14 @@ def show_benchmark_cases(bname: TBenchmarkName) -> str:
     if bname not in bmrt_cache["by_benchmark_name"]:
         return f"benchmark name not known: `{bname}`"
 
+    cache_key = ("cases", bname)
+    cacheable = _page_is_cacheable()
+    if cacheable:
+        cached_html = _get_cached_page(cache_key)
+        if cached_html is not None:
+            return cached_html
+
+    cache_meta = bmrt_cache["meta"]
     matching_results = bmrt_cache["by_benchmark_name"][bname]
     results_by_case_id: Dict[str, List[BMRTBenchmarkResult]] = collections.defaultdict(
         list
@@ -490,23 +554,28 @@ def show_benchmark_cases(bname: TBenchmarkName) -> str:
     for dskey in dead_stock_casekeys:
         del all_values_per_case_key_sorted[dskey]
 
-    hardware_count_per_case_id = {}
-    for case_id, results in results_by_case_id.items():
-        hardware_count_per_case_id[case_id] = len(
-            set([r.hardware_checksum for r in results])
-        )
-
-    last_result_per_case_id: Dict[str, BMRTBenchmarkResult] = {}
-
+    # Derive per-case hardware count, context count and newest result in a
+    # single pass over each case's results.
+    hardware_count_per_case_id: Dict[str, int] = {}
     context_count_per_case_id: Dict[str, int] = {}
+    last_result_per_case_id: Dict[str, BMRTBenchmarkResult] = {}
     for case_id, results in results_by_case_id.items():
-        context_count_per_case_id[case_id] = len(set([r.context_id for r in results]))
-        last_result_per_case_id[case_id] = newest_of_many_results(results)
-
-    return flask.render_template(
+        hwchecksums = set()
+        ctxids = set()
+        newest = results[0]
+        for r in results:
+            hwchecksums.add(r.hardware_checksum)
+            ctxids.add(r.context_id)
+            if r.started_at > newest.started_at:
+                newest = r
+        hardware_count_per_case_id[case_id] = len(hwchecksums)
+        context_count_per_case_id[case_id] = len(ctxids)
+        last_result_per_case_id[case_id] = newest
+
+    html = flask.render_template(
         "c-benchmark-cases.html",
         benchmark_name=bname,
-        bmr_cache_meta=bmrt_cache["meta"],
+        bmr_cache_meta=cache_meta,
         results_by_case_id=results_by_case_id,
         hardware_count_per_case_id=hardware_count_per_case_id,
         last_result_per_case_id=last_result_per_case_id,
@@ -517,6 +586,9 @@ def show_benchmark_cases(bname: TBenchmarkName) -> str:
         application=Config.APPLICATION_NAME,
         title=Config.APPLICATION_NAME,  # type: ignore
     )
+    if cacheable:
+        _set_cached_page(cache_key, cache_meta, html)
+    return html
 
 
 class TypeUIPlotInfo(TypedDict):
@@ -527,60 +599,53 @@ class TypeUIPlotInfo(TypedDict):
     aux_title: str
     n_results: int
     url_to_newest_result: str
-    data_for_uplot: List[List]
+    data_for_uplot: List[Union[List, np.ndarray]]
     unit: str
 
 
 @app.route("/c-benchmarks/<bname>/<caseid>", methods=["GET"])  # type: ignore
 @authorize_or_terminate
 def show_benchmark_results(bname: TBenchmarkName, caseid: str) -> str:
-    # First, filter by benchmark name.
-    try:
-        results_all_with_bname = bmrt_cache["by_benchmark_name"][bname]
-    except KeyError:
+    # Do not catch KeyError upon lookup for checking for key, because this
+    # would insert the key into the defaultdict(list) (as an empty list).
+    if bname not in bmrt_cache["by_benchmark_name"]:
         return f"benchmark name not known: `{bname}`"
 
-    # Now, filter those that have the required case ID set.
-    matching_results = []
-    for r in results_all_with_bname:
-        if r.case_id == caseid:
-            matching_results.append(r)
+    # The BMRT cache holds the results grouped by benchmark name and case ID.
+    arrays = bmrt_cache["arrays_by_bname_caseid"].get((bname, caseid))
 
-    # log.info(
-    #     "results_all_with_bname: %s, results with caseid and bname: %s",
-    #     len(results_all_with_bname),
-    #     len(matching_results),
-    # )
-
-    # Be explicit that this is now of no use.
-    del results_all_with_bname
-
-    if not matching_results:
+    if arrays is None:
         return f"no results found for benchmark `{bname}` and case `{caseid}`"
 
-    results_by_hardware_and_context: Dict[
-        Tuple, List[BMRTBenchmarkResult]
-    ] = collections.defaultdict(list)
+    matching_results = arrays.results
 
     # Build up timeseries of results (group results, don't sort them yet).
-    for result in matching_results:
-        # Store hardware name in dictionary key, for convenience.
-        hwchecksum, hwname, ctxid = (
-            result.hardware_checksum,
-            result.hardware_name,
-            result.context_id,
-        )
-        results_by_hardware_and_context[(hwchecksum, ctxid, hwname)].append(result)
+    offsets, group_idx_sorted, newest_idx_per_group = group_by_hw_ctx(
+        arrays.started_at, arrays.hardware_code, arrays.context_code
+    )
 
     # Make it so that infos_for_uplots is sorted by result count, i.e. show
     # most busy plots first. Instead, it might make sense to sort by recency!
-    results_by_hardware_and_context_sorted = dict(
-        sorted(
-            results_by_hardware_and_context.items(),
-            key=lambda item: len(item[1]),
-            reverse=True,
-        )
-    )
+    # The group sizes are known from the offsets: sort group numbers by size
+    # (stable, descending) and populate the dictionaries below in that order.
+    group_sizes = np.diff(offsets)
+    groups_by_size = np.argsort(-group_sizes, kind="stable")
+
+    results_by_hardware_and_context_sorted: Dict[Tuple, List[BMRTBenchmarkResult]] = {}
+    group_idx_by_hardware_and_context: Dict[Tuple, np.ndarray] = {}
+    newest_result_by_hardware_and_context: Dict[Tuple, BMRTBenchmarkResult] = {}
+    for g in groups_by_size.tolist():
+        lo, hi = offsets[g], offsets[g + 1]
+        group_idx = group_idx_sorted[lo:hi]
+        results = [arrays.results[i] for i in group_idx.tolist()]
+        # Store hardware name in dictionary key, for convenience.
+        r0 = results[0]
+        key = (r0.hardware_checksum, r0.context_id, r0.hardware_name)
+        results_by_hardware_and_context_sorted[key] = results
+        group_idx_by_hardware_and_context[key] = group_idx
+        newest_result_by_hardware_and_context[key] = arrays.results[
+            newest_idx_per_group[g]
+        ]
 
     # In the table show at most ~3000 results (for now, it's not really OK
     # to render it for 10000 results)
@@ -594,16 +659,17 @@ def show_benchmark_results(bname: TBenchmarkName, caseid: str) -> str:
     # based on, also JSON-serialized and then accessed by JavaScript.
     infos_for_uplots: Dict[str, TypeUIPlotInfo] = {}
 
-    units_seen = set()
+    # A single benchmark almost always reports a single unit. Compare against
+    # the first unit seen, and only collect the set of units (for a warning)
+    # once a different one shows up.
+    first_unit: Optional[str] = None
+    units_seen: Set[str] = set()
 
     # context_dicts_by_context_id: Dict[str, Dict[str, str]] = {}
     context_json_by_context_id: Dict[str, str] = {}
 
-    for (
-        hwchecksum,
-        ctxid,
-        _,
-    ), results in results_by_hardware_and_context_sorted.items():
+    for hwctx, results in results_by_hardware_and_context_sorted.items():
+        hwchecksum, ctxid, _ = hwctx
         # Only include those cases where there are at least three results.
         # (this structure is used for plotting only).
         if len(results) < 3:
@@ -618,15 +684,23 @@ def show_benchmark_results(bname: TBenchmarkName, caseid: str) -> str:
             results[0].context_dict, option=orjson.OPT_INDENT_2
         ).decode("utf-8")
 
-        newest_result = newest_of_many_results(results)
+        newest_result = newest_result_by_hardware_and_context[hwctx]
+        group_idx = group_idx_by_hardware_and_context[hwctx]
 
-        for r in results:
-            units_seen.add(r.unit)
+        group_units = arrays.unit[group_idx]
+        if first_unit is None:
+            first_unit = group_units[0]
+        if units_seen or not (group_units == first_unit).all():
+            units_seen.add(first_unit)
+            units_seen.update(group_units.tolist())
 
         infos_for_uplots[f"{hwchecksum}_{ctxid}"] = {
             "data_for_uplot": [
-                # Send timestamp with 1 second resolution.
-                [int(r.started_at) for r in results],
+                # Send timestamp with 1 second resolution. Slice the
+                # column-oriented data instead of accessing attributes of the
+                # individual result objects. Keep these as numpy arrays; orjson
+                # serializes them natively.
+                arrays.started_at[group_idx].astype(np.int64),
                 # Use single value summary (right now: mean or NaN). Also:
                 # there is no need to send an abstruse number of significant
                 # digits here (64 bit floating point precision). Benchmark
@@ -634,14 +708,9 @@ def show_benchmark_results(bname: TBenchmarkName, caseid: str) -> str:
                 # between invocations. If they do, it's a qualitative problem
                 # and the _precise_ difference does not need to be readable
                 # from these plots. I think sending detail across seven orders
-                # of magnitude is fine. Careful: >>>
-                # np.format_float_positional(float("NaN")) would return 'nan'
-                # (string). But for orjson to emit a `null` ( which is what
-                # uplot wants we should have a `None` in the list).
-                [
-                    conbench.numstr.numstr(r.svs, 7) if not math.isnan(r.svs) else None
-                    for r in results
-                ],
+                # of magnitude is fine. orjson emits `null` for NaN (which is
+                # what uplot wants).
+                conbench.numstr.round_sigfigs(arrays.svs[group_idx], 7),
             ],
             # Rely on at least one result being in the list.
             "hwchecksum": hwchecksum,
@@ -660,20 +729,19 @@ def show_benchmark_results(bname: TBenchmarkName, caseid: str) -> str:
     # For now, only emit a warning in the web application log.
     # TODO: show a user-facing warning on this page.
 
-    if len(units_seen) != 1:
+    if units_seen:
         log.warning(
             "/c-benchmarks/%s/%s: saw more than one unit: %s", bname, caseid, units_seen
         )
 
-    # Proceed, show a potentially wrong unit.
-    y_unit_for_all_plots = maybe_longer_unit(units_seen.pop())
+    # Proceed, show a potentially wrong unit. If no time series was long
+    # enough to be plotted, fall back to the unit of any matching result.
+    if first_unit is None:
+        first_unit = matching_results[0].unit
+    y_unit_for_all_plots = maybe_longer_unit(first_unit)
     # log.info("unit: %s", y_unit_for_all_plots)
 
-    # Need to find a way to put bytes straight into jinja template.
-    # still is still a tiny bit faster than using stdlib json.dumps()
-    infos_for_uplots_json = orjson.dumps(
-        infos_for_uplots, option=orjson.OPT_INDENT_2
-    ).decode("utf-8")
+    infos_for_uplots_json = uplot_infos_to_json_markup(infos_for_uplots)
 
     return flask.render_template(
         "c-benchmark-results-for-case.html",
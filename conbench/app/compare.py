@@ -1,5 +1,4 @@
 import abc
-import copy
 import json
 import logging
 from typing import List, Optional, Tuple
@@ -8,13 +7,14 @@ import bokeh
 import flask as f
 from werkzeug.exceptions import HTTPException
 
-from ..api.compare import CompareRunsAPI
+from ..api.compare import CompareBenchmarkResultsAPI, CompareRunsAPI
 from ..app import rule
 from ..app._endpoint import AppEndpoint, authorize_or_terminate
 from ..app._plots import TimeSeriesPlotMixin, simple_bar_plot
 from ..app._util import error_page
 from ..app.results import BenchmarkResultMixin, RunMixin
 from ..app.types import HighlightInHistPlot
+from ..cachetools import lru_cache_with_ttl
 from ..config import Config
 from ..entities.benchmark_result import BenchmarkResult
 
@@ -22,13 +22,10 @@ log = logging.getLogger(__name__)
 
 
 def all_keys(dict1, dict2, attr):
-    if dict1 is None:
-        dict1 = {}
-    if dict2 is None:
-        dict2 = {}
-    return sorted(
-        set(list(dict1.get(attr, {}).keys()) + list(dict2.get(attr, {}).keys()))
-    )
+    d1 = (dict1 or {}).get(attr) or {}
+    d2 = (dict2 or {}).get(attr) or {}
+    # Set union of the key views, without building intermediate lists.
+    return sorted(d1.keys() | d2.keys())
 
 
 class Compare(AppEndpoint, BenchmarkResultMixin, RunMixin, TimeSeriesPlotMixin):
@@ -79,8 +76,11 @@ class Compare(AppEndpoint, BenchmarkResultMixin, RunMixin, TimeSeriesPlotMixin):
             # get_history_plot(). This is a mad way to deal with madness.
             # We (really!) need to remove this API layer indirection:
             # https://github.com/conbench/conbench/issues/968
-            contender_benchmark_result = BenchmarkResult.one(id=contender["id"])
-            baseline_benchmark_result = BenchmarkResult.one(id=baseline["id"])
+            # Fetch both results with one query (`hardware` is loaded eagerly
+            # via JOIN).
+            results_by_id = BenchmarkResult.get_many([baseline["id"], contender["id"]])
+            contender_benchmark_result = results_by_id[contender["id"]]
+            baseline_benchmark_result = results_by_id[baseline["id"]]
             contender_hardware_checksum = contender_benchmark_result.hardware.hash
             baseline_hardware_checksum = baseline_benchmark_result.hardware.hash
 
@@ -125,15 +125,14 @@ class Compare(AppEndpoint, BenchmarkResultMixin, RunMixin, TimeSeriesPlotMixin):
         )
 
     def _get_plot(self, baseline, contender):
-        baseline_copy = copy.deepcopy(baseline)
-        contender_copy = copy.deepcopy(contender)
-        baseline_copy["tags"] = {
-            "compare": "baseline",
-            "name": baseline["display_case_perm"],
+        # Shallow copies suffice: only the top-level `tags` key is replaced.
+        baseline_copy = {
+            **baseline,
+            "tags": {"compare": "baseline", "name": baseline["display_case_perm"]},
         }
-        contender_copy["tags"] = {
-            "compare": "contender",
-            "name": contender["display_case_perm"],
+        contender_copy = {
+            **contender,
+            "tags": {"compare": "contender", "name": contender["display_case_perm"]},
         }
         plot = json.dumps(
             bokeh.embed.json_item(
@@ -244,28 +243,16 @@ class CompareBenchmarkResults(Compare):
     def get_comparisons(
         self, baseline_id: str, contender_id: str
     ) -> Tuple[List[dict], Optional[str]]:
-        # Re-assemble the stringified input argument for the virtual API
-        # endpoint, carrying both baseline and contender ID
-        params = {"compare_ids": f"{baseline_id}...{contender_id}"}
-        response = self.api_get("api.compare-benchmark-results", **params)
-
-        if response.status_code == 200:
-            return [response.json], None
-
-        log.error(
-            "processing req to %s -- unexpected response for virtual request: %s, %s",
-            f.request.url,
-            response.status_code,
-            response.text,
-        )
-        # poor-mans error propagation, until we remove the API
-        # layer indirection.
-        errmsg = response.text
+        # Instead of hitting the API we'll hit the DB directly using the same code.
         try:
-            errmsg = response.json["description"]
-        except Exception:
-            pass
-        return [], errmsg
+            response = CompareBenchmarkResultsAPI()._get_response_as_dict(
+                compare_ids=f"{baseline_id}...{contender_id}",
+                threshold=None,
+                threshold_z=None,
+            )
+            return [response], None
+        except HTTPException as e:
+            return [], e.description
 
 
 class CompareRuns(Compare):
@@ -280,18 +267,41 @@ class CompareRuns(Compare):
     ) -> Tuple[List[dict], str | None]:
         # Instead of hitting the API we'll hit the DB directly using the same code.
         try:
-            api = CompareRunsAPI()
-            response = api._get_response_as_dict(
-                compare_ids=f"{baseline_id}...{contender_id}",
-                cursor=None,
-                page_size=None,
-                threshold=None,
-                threshold_z=None,
+            response = _get_compare_runs_response_cached(
+                baseline_id, contender_id, threshold=None, threshold_z=None
             )
-            return response["data"], None
         except HTTPException as e:
             return [], e.description
 
+        # The response is shared with other requests via the cache. Callers
+        # (see Compare._compare()) set keys on the individual comparison
+        # dictionaries: hand out shallow copies.
+        return [dict(c) for c in response["data"]], None
+
+
+# Users tend to load the same pair of runs repeatedly (page refresh, shared
+# links). Cache the comparison result for a minute; this applies to all
+# request-serving threads in this process. Exceptions (e.g. 404 for an unknown
+# run ID) are not cached.
+# Note that expired entries are not evicted; they are only replaced when the
+# LRU cache is full. A single comparison of two large runs can be several MB
+# in size: keep `maxsize` small to bound memory usage (per worker process) to
+# a few dozen MB.
+@lru_cache_with_ttl(maxsize=16, ttl=60)
+def _get_compare_runs_response_cached(
+    baseline_id: str,
+    contender_id: str,
+    threshold: Optional[float],
+    threshold_z: Optional[float],
+) -> dict:
+    return CompareRunsAPI()._get_response_as_dict(
+        compare_ids=f"{baseline_id}...{contender_id}",
+        cursor=None,
+        page_size=None,
+        threshold=threshold,
+        threshold_z=threshold_z,
+    )
+
 
 rule(
     "/compare/benchmark-results/<compare_ids>/",
@@ -30,6 +30,7 @@ Current implementation properties:
 
 import dataclasses
 import hashlib
+import heapq
 import logging
 import threading
 import time
@@ -37,6 +38,7 @@ from collections import defaultdict
 from datetime import datetime
 from typing import Dict, List, Tuple, TypedDict, cast
 
+import numpy as np
 import pandas as pd
 import sqlalchemy
 import sqlalchemy.orm
@@ -66,6 +68,10 @@ if Config.TESTING:
     # quicker update in testing
     BMRT_CACHE_SIZE = 0.05 * 10**6
 
+# Number of benchmark names (those with the most recent results) to keep
+# track of for the UI.
+BNAMES_NEWEST_TOPN = 20
+
 
 @dataclasses.dataclass
 class CacheUpdateMetaInfo:
@@ -142,6 +148,49 @@ class ResultTimeseries:
     bmrlist: List[BMRTBenchmarkResult]
 
 
+@dataclasses.dataclass(slots=True)
+class BMRTArrays:
+    """
+    Column-oriented (struct-of-arrays) representation of all results for one
+    (benchmark name, case ID) combination. Index `i` in each array refers to
+    `results[i]`.
+
+    This allows for filtering/grouping with numpy operations instead of
+    looping over (and accessing attributes of) many Python objects.
+    """
+
+    results: List[BMRTBenchmarkResult]
+    # POSIX timestamps (float64)
+    started_at: np.ndarray
+    # Single value summary (float64), NaN for failed results
+    svs: np.ndarray
+    # Units (object array of str)
+    unit: np.ndarray
+    # Integer codes (int64) for hardware checksum and context ID; only
+    # meaningful for equality comparison within this set of arrays.
+    hardware_code: np.ndarray
+    context_code: np.ndarray
+
+
+@dataclasses.dataclass(slots=True)
+class BMRTBnameAggregates:
+    """
+    Per-benchmark-name aggregates, derived from `by_benchmark_name` once per
+    cache population (instead of once per HTTP request).
+
+    These are assigned to the cache in a single step, so that a consumer that
+    binds this object once sees a consistent snapshot: each benchmark name in
+    the lists below is a key in both dictionaries.
+    """
+
+    by_benchmark_name: Dict[TBenchmarkName, List[BMRTBenchmarkResult]]
+    newest_by_bname: Dict[TBenchmarkName, BMRTBenchmarkResult]
+    bnames_sorted_alpha: List[TBenchmarkName]
+    # Only the BNAMES_NEWEST_TOPN benchmark names with the newest results.
+    bnames_newest_topn: List[TBenchmarkName]
+    bnames_sorted_by_resultcount: List[TBenchmarkName]
+
+
 # A type for a dictionary: key is 4-tuple defining a time series, and value is
 # a pandas dataframe containing the time series (index: pd.DateTimeIndex
 # tz-aware, one column: single value summary).
@@ -156,6 +205,8 @@ class CacheDict(TypedDict):
     by_run_id: Dict[str, List[BMRTBenchmarkResult]]
     by_4t_df: TDict4tdf
     by_4t_list: TDict4tlist
+    arrays_by_bname_caseid: Dict[Tuple[TBenchmarkName, str], BMRTArrays]
+    bname_aggregates: BMRTBnameAggregates
     meta: CacheUpdateMetaInfo
 
 
@@ -166,6 +217,14 @@ _init_metainfo = CacheUpdateMetaInfo(
     covered_timeframe_days_approx="n/a",
 )
 
+_init_bname_aggregates = BMRTBnameAggregates(
+    by_benchmark_name={},
+    newest_by_bname={},
+    bnames_sorted_alpha=[],
+    bnames_newest_topn=[],
+    bnames_sorted_by_resultcount=[],
+)
+
 _FIRST_REFRESH_DONE_EVENT = threading.Event()
 
 # Think: future: do work in a child process, provide dictionary via shared
@@ -184,6 +243,8 @@ bmrt_cache: CacheDict = {
     "by_4t_list": {},
     "by_4t_df": {},
     "by_run_id": {},
+    "arrays_by_bname_caseid": {},
+    "bname_aggregates": _init_bname_aggregates,
     "meta": _init_metainfo,
 }
 
@@ -192,6 +253,8 @@ def reinit():
     for k in bmrt_cache:
         if k == "meta":
             bmrt_cache[k] = _init_metainfo
+        elif k == "bname_aggregates":
+            bmrt_cache[k] = _init_bname_aggregates
         else:
             bmrt_cache[k] = {}
 
@@ -372,6 +435,28 @@ def _fetch_and_cache_most_recent_results_guts(
 
     # Group all benchmark results into timeseries
     dict4tdf, bmrlist_by_4tuple = _generate_tsdf_per_4tuple(by_name_dict)
+    arrays_by_bname_caseid = _generate_arrays_per_bname_caseid(by_name_dict)
+
+    newest_by_bname = {
+        bname: max(results, key=lambda r: r.started_at)
+        for bname, results in by_name_dict.items()
+    }
+    bname_aggregates = BMRTBnameAggregates(
+        by_benchmark_name=by_name_dict,
+        newest_by_bname=newest_by_bname,
+        bnames_sorted_alpha=sorted(by_name_dict, key=str.lower),
+        # Newest first. Partial selection (O(N log k)) instead of a full sort:
+        # the UI only shows the top k.
+        bnames_newest_topn=heapq.nlargest(
+            BNAMES_NEWEST_TOPN,
+            newest_by_bname,
+            key=lambda bname: newest_by_bname[bname].started_at,
+        ),
+        # Most results first.
+        bnames_sorted_by_resultcount=sorted(
+            by_name_dict, key=lambda bname: len(by_name_dict[bname]), reverse=True
+        ),
+    )
 
     # Mutate the dictionary which is accessed by other threads, do this in a
     # quick fashion -- each of this assignments is atomic (thread-safe), but
@@ -385,6 +470,8 @@ def _fetch_and_cache_most_recent_results_guts(
     bmrt_cache["by_4t_df"] = dict4tdf
     bmrt_cache["by_4t_list"] = bmrlist_by_4tuple
     bmrt_cache["by_run_id"] = by_run_id_dict
+    bmrt_cache["arrays_by_bname_caseid"] = arrays_by_bname_caseid
+    bmrt_cache["bname_aggregates"] = bname_aggregates
     bmrt_cache["meta"] = CacheUpdateMetaInfo(
         newest_result_time_str=first_result.ui_time_started_at,
         covered_timeframe_days_approx=str(
@@ -552,6 +639,47 @@ def _generate_tsdf_per_4tuple(
     return tsdf_by_4tuple, bmrlist_by_4tuple
 
 
+def _generate_arrays_per_bname_caseid(
+    by_name_dict: Dict[TBenchmarkName, List[BMRTBenchmarkResult]]
+) -> Dict[Tuple[TBenchmarkName, str], BMRTArrays]:
+    t0 = time.monotonic()
+    by_bname_caseid: Dict[
+        Tuple[TBenchmarkName, str], List[BMRTBenchmarkResult]
+    ] = defaultdict(list)
+
+    for bname, results in by_name_dict.items():
+        for r in results:
+            by_bname_caseid[(bname, r.case_id)].append(r)
+
+    arrays_by_bname_caseid: Dict[Tuple[TBenchmarkName, str], BMRTArrays] = {}
+    for bname_caseid, results in by_bname_caseid.items():
+        # Map each distinct string to a small integer (its index in the sorted
+        # set of unique values).
+        _, hardware_codes = np.unique(
+            np.array([r.hardware_checksum for r in results], dtype=object),
+            return_inverse=True,
+        )
+        _, context_codes = np.unique(
+            np.array([r.context_id for r in results], dtype=object),
+            return_inverse=True,
+        )
+        arrays_by_bname_caseid[bname_caseid] = BMRTArrays(
+            results=results,
+            started_at=np.array([r.started_at for r in results], dtype=np.float64),
+            svs=np.array([r.svs for r in results], dtype=np.float64),
+            unit=np.array([r.unit for r in results], dtype=object),
+            hardware_code=hardware_codes.astype(np.int64),
+            context_code=context_codes.astype(np.int64),
+        )
+
+    log.info(
+        "BMRT cache pop: array constr took %.3f s (%s cases)",
+        time.monotonic() - t0,
+        len(arrays_by_bname_caseid),
+    )
+    return arrays_by_bname_caseid
+
+
 # def yappi_print_threads_stats():
 #     """ """
 #     threads = yappi.get_thread_stats()
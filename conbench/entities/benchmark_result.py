@@ -321,6 +321,17 @@ class BenchmarkResult(Base, EntityMixin):
 
         super().update(data)
 
+    @classmethod
+    def get_many(cls, ids: List[str]) -> Dict[str, "BenchmarkResult"]:
+        """
+        Fetch the benchmark results with the given IDs in a single query.
+
+        Return a dictionary mapping ID to benchmark result. IDs that are not
+        known are not present in the returned dictionary.
+        """
+        results = current_session.scalars(s.select(cls).where(cls.id.in_(ids))).all()
+        return {r.id: r for r in results}
+
     def to_dict_for_json_api(benchmark_result):
         # `self` is just convention :-P
 
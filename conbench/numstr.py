@@ -116,6 +116,45 @@ def numstr(v: Union[float, int], sigfigs: int = 5) -> str:
     return np.format_float_positional(v, precision=sigfigs, trim="-", fractional=False)
 
 
+# 10.0**308 is (close to) the largest finite power of ten in float64. Stay
+# clear of that.
+_MAX_DECIMAL_SHIFT = 300
+
+
+def round_sigfigs(values: np.ndarray, sigfigs: int = 5) -> np.ndarray:
+    """
+    Round each value in a float array to `sigfigs` significant figures.
+
+    Vectorized counterpart to numstr() for when the numbers are serialized by
+    a fast JSON encoder (orjson emits the shortest representation of each
+    float) instead of being stringified one by one. NaN and inf are retained,
+    as is zero. So are values too close to zero (e.g. subnormal) or too large
+    for the decimal shift to be representable; those are returned unmodified.
+
+    >>> round_sigfigs(np.array([0.00123912382981923, 1232132923.2378, np.nan]), 5)
+    array([1.2391e-03, 1.2321e+09,        nan])
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitudes = np.floor(np.log10(np.abs(values)))
+    # Exponent of the decimal shift that moves the last significant figure
+    # to the ones place.
+    exps = sigfigs - 1 - magnitudes
+    # Leave non-finite values and zero alone, as well as values for which
+    # 10**abs(exp) would overflow.
+    shiftable = np.isfinite(exps) & (np.abs(exps) <= _MAX_DECIMAL_SHIFT)
+    exps = np.where(shiftable, exps, 0)
+    # Only ever multiply/divide by (exactly representable, for reasonable
+    # exponents) positive powers of ten to not introduce representation noise
+    # like 123456800.00000001.
+    scales = 10.0 ** np.abs(exps)
+    rounded = np.where(
+        exps >= 0,
+        np.round(values * scales) / scales,
+        np.round(values / scales) * scales,
+    )
+    return np.where(shiftable, rounded, values)
+
+
 _conversion_correctness_tests = (
     (15272063, "15272000"),  #
     # Works with float and int input.
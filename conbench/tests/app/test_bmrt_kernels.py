@@ -0,0 +1,43 @@
+import numpy as np
+
+from conbench.app._bmrt_kernels import group_by_hw_ctx
+
+
+def test_group_by_hw_ctx():
+    started_at = np.array([5.0, 1.0, 7.0, 3.0, 7.0, 2.0])
+    hw_codes = np.array([0, 1, 0, 1, 0, 0], dtype=np.int64)
+    ctx_codes = np.array([0, 0, 0, 0, 0, 1], dtype=np.int64)
+
+    offsets, order, newest_idx_per_group = group_by_hw_ctx(
+        started_at, hw_codes, ctx_codes
+    )
+
+    groups = []
+    for g in range(3):
+        lo, hi = offsets[g], offsets[g + 1]
+        groups.append(order[lo:hi].tolist())
+    assert len(offsets) == 4
+    # Groups are numbered by first appearance; input order is retained within
+    # each group.
+    assert groups == [[0, 2, 4], [1, 3], [5]]
+
+    # On a tie (index 2 and 4), the first one wins.
+    assert newest_idx_per_group.tolist() == [2, 3, 5]
+
+
+def test_group_by_hw_ctx_first_appearance_order():
+    # Sorted by key, the group (hw 2, ctx 0) would come last.
+    started_at = np.array([1.0, 2.0, 3.0, 4.0])
+    hw_codes = np.array([2, 0, 1, 0], dtype=np.int64)
+    ctx_codes = np.array([0, 0, 0, 0], dtype=np.int64)
+
+    offsets, order, newest_idx_per_group = group_by_hw_ctx(
+        started_at, hw_codes, ctx_codes
+    )
+
+    groups = []
+    for g in range(len(offsets) - 1):
+        lo, hi = offsets[g], offsets[g + 1]
+        groups.append(order[lo:hi].tolist())
+    assert groups == [[0], [1, 3], [2]]
+    assert newest_idx_per_group.tolist() == [0, 3, 2]
@@ -1,5 +1,6 @@
 import copy
 
+from ...app.compare import CompareRuns, _get_compare_runs_response_cached
 from ...tests.api import _fixtures
 from ...tests.app import _asserts
 
@@ -143,6 +144,33 @@ class TestCompareRuns(_asserts.GetEnforcer):
         response = client.post("/api/benchmarks/", json=payload)
         assert response.status_code == 201, response.text
 
+    def test_comparisons_cached(self, client):
+        self.authenticate(client)
+        self._post_result(client, "run1", "python")
+        self._post_result(client, "run2", "python")
+
+        with client.application.test_request_context():
+            comparisons, err = CompareRuns().get_comparisons("run1", "run2")
+            assert err is None
+            assert len(comparisons) == 1
+
+            # Add another comparable pair of results. Within the TTL, the
+            # cached comparisons are returned.
+            self._post_result(client, "run1", "R")
+            self._post_result(client, "run2", "R")
+            comparisons_2, _ = CompareRuns().get_comparisons("run1", "run2")
+            assert comparisons_2 == comparisons
+
+            # Mutating a returned comparison must not affect the cache entry.
+            comparisons_2[0]["baseline"] = "mutated"
+            comparisons_3, _ = CompareRuns().get_comparisons("run1", "run2")
+            assert comparisons_3 == comparisons
+            assert comparisons_3[0]["baseline"] != "mutated"
+
+            _get_compare_runs_response_cached.cache_clear()
+            comparisons_4, _ = CompareRuns().get_comparisons("run1", "run2")
+            assert len(comparisons_4) == 2
+
     def test_mismatching_runs(self, client):
         self.authenticate(client)
 
@@ -1,5 +1,8 @@
+import copy
+
 import pytest
 
+import conbench.app.benchmarks
 import conbench.bmrt
 import conbench.job
 
@@ -87,6 +90,88 @@ class TestCBenchmarks(_asserts.AppEndpointTest):
         assert "fun-benchmark" in resp.text
         assert "1 unique benchmark names seen across the 1 newest results" in resp.text
 
+    def test_anonymous_page_cache_invalidated_upon_refresh(self, client):
+        self.authenticate(client)
+        resp = client.post("/api/benchmark-results/", json=benchmark_result_dict)
+        assert resp.status_code == 201, f"{resp.status_code}\n{resp.text}"
+        self.logout(client)
+
+        # Populate the BMRT cache synchronously (not via the periodic job).
+        conbench.bmrt._fetch_and_cache_most_recent_results()
+
+        resp = client.get("/c-benchmarks/")
+        assert "fun-benchmark" in resp.text
+        assert "1 unique benchmark names seen across the 1 newest results" in resp.text
+        # The page rendered for the anonymous user is now cached.
+        assert ("list",) in conbench.app.benchmarks._page_cache
+        assert client.get("/c-benchmarks/").text == resp.text
+
+        self.authenticate(client)
+        result_2 = copy.deepcopy(benchmark_result_dict)
+        result_2["tags"]["name"] = "other-benchmark"
+        resp = client.post("/api/benchmark-results/", json=result_2)
+        assert resp.status_code == 201, f"{resp.status_code}\n{resp.text}"
+        self.logout(client)
+
+        # Before the refresh, the cached page is served.
+        assert "other-benchmark" not in client.get("/c-benchmarks/").text
+
+        # A BMRT cache refresh invalidates the cached page.
+        conbench.bmrt._fetch_and_cache_most_recent_results()
+        resp = client.get("/c-benchmarks/")
+        assert "other-benchmark" in resp.text
+        assert "2 unique benchmark names seen across the 2 newest results" in resp.text
+
+    def test_anonymous_page_cache_skipped_with_pending_flash(self, client, monkeypatch):
+        monkeypatch.setattr(conbench.app.benchmarks, "_page_cache", {})
+        self.logout(client)
+
+        with client.session_transaction() as session:
+            session["_flashes"] = [("info", "flashy-message")]
+
+        # The flash message is shown (and consumed), but the page containing
+        # it is not cached.
+        resp = client.get("/c-benchmarks/")
+        assert "flashy-message" in resp.text
+        assert ("list",) not in conbench.app.benchmarks._page_cache
+
+        resp = client.get("/c-benchmarks/")
+        assert "flashy-message" not in resp.text
+        assert ("list",) in conbench.app.benchmarks._page_cache
+
+        # A cached page must not swallow another pending flash message.
+        with client.session_transaction() as session:
+            session["_flashes"] = [("info", "flashy-message-2")]
+        assert "flashy-message-2" in client.get("/c-benchmarks/").text
+
+    def test_anonymous_page_cache_size_limit(self, client, monkeypatch):
+        monkeypatch.setattr(conbench.app.benchmarks, "_page_cache", {})
+        monkeypatch.setattr(conbench.app.benchmarks, "_PAGE_CACHE_MAX_ENTRIES", 2)
+
+        self.authenticate(client)
+        for name in ("bench-1", "bench-2"):
+            result = copy.deepcopy(benchmark_result_dict)
+            result["tags"]["name"] = name
+            resp = client.post("/api/benchmark-results/", json=result)
+            assert resp.status_code == 201, f"{resp.status_code}\n{resp.text}"
+        self.logout(client)
+
+        conbench.bmrt._fetch_and_cache_most_recent_results()
+
+        for relpath in ("/c-benchmarks/", "/c-benchmarks/bench-1"):
+            assert client.get(relpath).status_code == 200
+        assert set(conbench.app.benchmarks._page_cache) == {
+            ("list",),
+            ("cases", "bench-1"),
+        }
+
+        # The oldest entry is evicted.
+        assert client.get("/c-benchmarks/bench-2").status_code == 200
+        assert set(conbench.app.benchmarks._page_cache) == {
+            ("cases", "bench-1"),
+            ("cases", "bench-2"),
+        }
+
     @pytest.mark.parametrize(
         "relpath",
         ["/c-benchmarks", "/c-benchmarks/bname", "/c-benchmarks/bname/caseid"],
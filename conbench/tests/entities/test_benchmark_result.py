@@ -0,0 +1,16 @@
+from ...entities.benchmark_result import BenchmarkResult
+from ...tests.api import _fixtures
+
+
+def test_get_many():
+    result_1 = _fixtures.benchmark_result()
+    result_2 = _fixtures.benchmark_result()
+
+    results_by_id = BenchmarkResult.get_many([result_1.id, result_2.id, "unknown"])
+
+    # Unknown IDs are not present in the returned dictionary.
+    assert set(results_by_id) == {result_1.id, result_2.id}
+    assert results_by_id[result_1.id] == result_1
+    assert results_by_id[result_2.id] == result_2
+
+    assert BenchmarkResult.get_many(["unknown"]) == {}
@@ -0,0 +1,45 @@
+import math
+import warnings
+
+import numpy as np
+import pytest
+
+from conbench.numstr import _conversion_correctness_tests, numstr, round_sigfigs
+
+
+@pytest.mark.parametrize("value, expected", _conversion_correctness_tests)
+def test_numstr(value, expected):
+    assert numstr(value) == expected
+
+
+def test_round_sigfigs_matches_numstr():
+    values = np.array([float(v) for v, _ in _conversion_correctness_tests])
+    rounded = round_sigfigs(values, 5)
+    for v, r in zip(values.tolist(), rounded.tolist()):
+        assert r == float(numstr(v, 5))
+        # Negative values are rounded symmetrically.
+        assert round_sigfigs(np.array([-v]), 5)[0] == -r
+
+
+@pytest.mark.parametrize("sigfigs", [3, 7])
+def test_round_sigfigs_matches_numstr_sigfigs(sigfigs):
+    values = np.array([1.290823987290392, 123912.0, 0.000123888129341456, 9.73e8])
+    rounded = round_sigfigs(values, sigfigs)
+    assert rounded.tolist() == [float(numstr(v, sigfigs)) for v in values.tolist()]
+
+
+def test_round_sigfigs_special_values():
+    values = np.array([np.nan, 0.0, -0.0, np.inf, -np.inf, -1.23456])
+    rounded = round_sigfigs(values, 5)
+    assert math.isnan(rounded[0])
+    assert rounded[1:].tolist() == [0.0, -0.0, math.inf, -math.inf, -1.2346]
+
+
+def test_round_sigfigs_tiny_and_huge_values_unmodified():
+    # The decimal shift required for these would overflow: expect no warning,
+    # and the input values to be returned as-is.
+    values = np.array([5e-324, 2.2e-308, 1.7e308])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        rounded = round_sigfigs(values, 5)
+    assert rounded.tolist() == values.tolist()
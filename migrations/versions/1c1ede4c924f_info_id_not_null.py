@@ -28,45 +28,41 @@ def upgrade():
 
     info_table = meta.tables["info"]
     summary_table = meta.tables["summary"]
-    summaries = list(
-        connection.execute(
-            summary_table.select().filter(summary_table.c.info_id.is_(None))
-        )
-    )
+    null_summary = connection.execute(
+        sa.select(summary_table.c.id).where(summary_table.c.info_id.is_(None)).limit(1)
+    ).fetchone()
 
-    null_info, num = None, len(summaries)
-    for i, summary in enumerate(summaries):
-        logger.info(f"Found NULL {i + 1} of {num}: {summary.id}")
+    if null_summary:
+        null_info = connection.execute(
+            info_table.select().where(
+                info_table.c.tags == {},
+            )
+        ).fetchone()
 
-        if not null_info:
+        if null_info:
+            logger.info("Found NULL info")
+        else:
+            logger.info("No NULL info")
+            new_info_id = uuid.uuid4().hex
+            connection.execute(
+                info_table.insert().values(
+                    id=new_info_id,
+                    tags={},
+                )
+            )
             null_info = connection.execute(
                 info_table.select().where(
                     info_table.c.tags == {},
                 )
             ).fetchone()
 
-            if null_info:
-                logger.info("Found NULL info")
-            else:
-                logger.info("No NULL info")
-                new_info_id = uuid.uuid4().hex
-                connection.execute(
-                    info_table.insert().values(
-                        id=new_info_id,
-                        tags={},
-                    )
-                )
-                null_info = connection.execute(
-                    info_table.select().where(
-                        info_table.c.tags == {},
-                    )
-                ).fetchone()
-
-        connection.execute(
+        # Update all affected rows with a single statement.
+        result = connection.execute(
             summary_table.update()
-            .where(summary_table.c.id == summary.id)
+            .where(summary_table.c.info_id.is_(None))
             .values(info_id=null_info.id)
         )
+        logger.info(f"Set NULL info for {result.rowcount} summaries")
 
     op.alter_column(
         "summary", "info_id", existing_type=sa.VARCHAR(length=50), nullable=False